@@ -1,39 +1,229 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
-from datetime import datetime, timedelta
+from plotly.colors import qualitative
+import io
+import functools
+from datetime import datetime
 import numpy as np
+from build_data import DATA_PATH
 
-# Load the processed data (you'll need to save and load it)
-@st.cache_data
+SENTIMENT_COLORS = {
+    'positive': '#2E8B57',
+    'negative': '#DC143C',
+    'neutral': '#4682B4'
+}
+EMOTION_COLORS = qualitative.Set3
+
+# Cap on points per trend trace sent to the browser
+MAX_TREND_POINTS = 2000
+
+# Below this many rows pandas' crosstab is fast enough and JIT compiling doesn't pay off
+NUMBA_MIN_ROWS = 1_000_000
+
+# Filter combinations kept per cached aggregation before the oldest is evicted
+MAX_CACHED_SELECTIONS = 32
+# Filtered frames can be nearly as large as the dataset, so keep only the latest couple;
+# the aggregations above are cached separately and only hit filter_data on a miss
+MAX_CACHED_FRAMES = 2
+
+# Common words removed from the word cloud
+STOP_WORDS = frozenset({'dbs', 'bank', 'india', 'banking', 'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should'})
+
+# Load the processed data (regenerate with `python build_data.py`)
+# cache_resource hands back the same frame without a pickle copy; callers must treat it as read-only
+@st.cache_resource
 def load_data():
-    # In a real scenario, load from file or database
-    # For now, we'll create sample data
-    sample_data = {
-        'text': [
-            'DBS Bank India has excellent customer service and quick loan approval',
-            'DBS app crashes too often, very frustrating experience',
-            'DBS net banking interface is user-friendly and secure',
-            'DBS credit card has high interest rates, not recommended',
-            'DBS mobile banking works smoothly, love the features',
-            'Poor customer support from DBS Bank India branch',
-            'DBS digibank is innovative and convenient for daily banking',
-            'DBS loan process is too lengthy and complicated',
-            'Great experience with DBS debit card internationally',
-            'DBS bank charges are reasonable compared to other banks'
-        ],
-        'sentiment': ['positive', 'negative', 'positive', 'negative', 'positive', 'negative', 'positive', 'negative', 'positive', 'neutral'],
-        'emotion': ['happy', 'angry', 'satisfied', 'disappointed', 'happy', 'angry', 'satisfied', 'disappointed', 'happy', 'neutral'],
-        'source': ['News', 'Reddit', 'News', 'Reddit', 'News', 'Reddit', 'News', 'Reddit', 'News', 'Reddit'],
-        'platform': ['Economic Times', 'r/india', 'Business Standard', 'r/bangalore', 'Financial Express', 'r/mumbai', 'Times of India', 'r/delhi', 'Hindu Business', 'r/india'],
-        'search_term': ['DBS Bank India', 'DBS app', 'DBS net banking', 'DBS credit card', 'DBS mobile banking', 'DBS Bank India', 'DBS digibank', 'DBS loan', 'DBS debit card', 'DBS Bank India'],
-        'polarity': [0.8, -0.7, 0.6, -0.5, 0.7, -0.6, 0.8, -0.4, 0.9, 0.1],
-        'date': pd.date_range(start='2024-06-01', periods=10, freq='D')
+    # Arrow-backed columns straight from the Parquet buffers (no conversion to NumPy on load)
+    df = pd.read_parquet(DATA_PATH, engine='pyarrow', dtype_backend='pyarrow')
+    
+    # Low-cardinality columns as categoricals so filters/groupbys work on integer codes
+    for col in ('sentiment', 'emotion', 'source', 'platform', 'search_term'):
+        if not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    
+    # Arrow-backed strings keep the text column in one buffer instead of per-row Python objects
+    df['text'] = df['text'].astype('string[pyarrow]')
+    
+    # Dates stay NumPy datetime64: the hot paths use the raw buffer and CSV export keeps plain dates
+    df['date'] = df['date'].astype('datetime64[ns]')
+    
+    # Sidebar options come straight from the categories, no scan needed
+    filter_options = {
+        'source': df['source'].cat.categories.tolist(),
+        'search_term': df['search_term'].cat.categories.tolist()
+    }
+    return df, filter_options
+
+# Aggregations below are cached on the (hashable) filter values so widget
+# interactions that don't change the filters skip recomputation entirely.
+# The filtered frame itself is a shared, read-only resource; only the small
+# aggregated results go through cache_data (which copies on every hit).
+@st.cache_resource(max_entries=MAX_CACHED_FRAMES)
+def filter_data(sources, products, start_date, end_date):
+    df, _ = load_data()
+    masks = [
+        df['source'].isin(sources).to_numpy(),
+        df['search_term'].isin(products).to_numpy()
+    ]
+    if start_date is not None and end_date is not None:
+        # Compare on the raw datetime64 buffer rather than boxing via .dt.date
+        date_vals = df['date'].to_numpy()
+        t0 = pd.Timestamp(start_date).to_datetime64()
+        t1 = (pd.Timestamp(end_date) + pd.Timedelta(days=1)).to_datetime64()
+        masks += [date_vals >= t0, date_vals < t1]
+    return df[np.logical_and.reduce(masks)]
+
+@st.cache_data(max_entries=MAX_CACHED_SELECTIONS)
+def count_rows(sources, products, start_date, end_date):
+    return len(filter_data(sources, products, start_date, end_date))
+
+@st.cache_data(max_entries=MAX_CACHED_SELECTIONS)
+def compute_sentiment_counts(sources, products, start_date, end_date):
+    return filter_data(sources, products, start_date, end_date)['sentiment'].value_counts()
+
+@st.cache_data(max_entries=MAX_CACHED_SELECTIONS)
+def compute_emotion_counts(sources, products, start_date, end_date):
+    emotion_counts = filter_data(sources, products, start_date, end_date)['emotion'].value_counts()
+    return emotion_counts[emotion_counts > 0]
+
+@functools.lru_cache(maxsize=None)
+def load_agg_counts():
+    # numba (pinned in requirements.txt) costs ~190ms to import, so it is only loaded once a
+    # frame reaches NUMBA_MIN_ROWS; without it the app stays on the crosstab path
+    try:
+        from numba import njit
+    except ImportError:
+        return None
+    
+    @njit(cache=True)
+    def agg_counts(row_codes, col_codes, n_rows, n_cols):
+        # Serial loop: a parallel prange would race on the shared out[] increments
+        out = np.zeros((n_rows, n_cols), np.int64)
+        for i in range(row_codes.size):
+            out[row_codes[i], col_codes[i]] += 1
+        return out
+    return agg_counts
+
+def use_numba(df):
+    return len(df) >= NUMBA_MIN_ROWS and load_agg_counts() is not None
+
+def count_matrix(row_codes, row_labels, sentiment):
+    # Same shape as pd.crosstab(rows, sentiment): observed rows/columns only, and rows
+    # with a null key (code -1) dropped rather than wrapped into the last column
+    sent_codes = sentiment.cat.codes.to_numpy()
+    valid = (row_codes >= 0) & (sent_codes >= 0)
+    counts = load_agg_counts()(row_codes[valid], sent_codes[valid], len(row_labels), len(sentiment.cat.categories))
+    table = pd.DataFrame(counts, index=row_labels, columns=pd.Index(sentiment.cat.categories, name='sentiment'))
+    return table.loc[counts.any(axis=1), counts.any(axis=0)]
+
+@st.cache_data(max_entries=MAX_CACHED_SELECTIONS)
+def compute_daily_sentiment(sources, products, start_date, end_date):
+    df_filtered = filter_data(sources, products, start_date, end_date)
+    # Wide day x sentiment table; flooring the datetime64 buffer avoids hashing Python date objects
+    day = df_filtered['date'].to_numpy().astype('datetime64[D]')
+    has_day = ~np.isnat(day)
+    if use_numba(df_filtered) and has_day.any():
+        # NaT would become INT64_MIN, so offsets are taken over real days only
+        day_num = day.astype(np.int64)
+        first, last = day_num[has_day].min(), day_num[has_day].max()
+        days = pd.Index(np.arange(first, last + 1).astype('datetime64[D]'), name='date')
+        return count_matrix(np.where(has_day, day_num - first, -1), days, df_filtered['sentiment'])
+    return pd.crosstab(day, df_filtered['sentiment'], rownames=['date'])
+
+def lttb_downsample(x, y, n_out):
+    # Largest-Triangle-Three-Buckets: keep first/last points and, per bucket,
+    # the point forming the largest triangle with the previous pick and the next bucket's mean
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+    xf = (x.astype(np.int64) if np.issubdtype(x.dtype, np.datetime64) else x).astype(np.float64)
+    yf = y.astype(np.float64)
+    
+    every = (n - 2) / (n_out - 2)
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x, avg_y = xf[end:next_end].mean(), yf[end:next_end].mean()
+        area = np.abs((xf[a] - avg_x) * (yf[start:end] - yf[a]) - (xf[a] - xf[start:end]) * (avg_y - yf[a]))
+        a = start + int(area.argmax())
+        idx[i + 1] = a
+    return x[idx], y[idx]
+
+@st.cache_data(max_entries=MAX_CACHED_SELECTIONS)
+def compute_trend_traces(sources, products, start_date, end_date):
+    daily_sentiment = compute_daily_sentiment(sources, products, start_date, end_date)
+    x = daily_sentiment.index.to_numpy()
+    return {
+        sentiment: lttb_downsample(x, daily_sentiment[sentiment].to_numpy(), MAX_TREND_POINTS)
+        for sentiment in daily_sentiment.columns
     }
-    return pd.DataFrame(sample_data)
+
+@st.cache_data(max_entries=MAX_CACHED_SELECTIONS)
+def compute_product_sentiment(sources, products, start_date, end_date):
+    df_filtered = filter_data(sources, products, start_date, end_date)
+    if use_numba(df_filtered):
+        terms = df_filtered['search_term']
+        return count_matrix(terms.cat.codes.to_numpy(), pd.Index(terms.cat.categories, name='search_term'), df_filtered['sentiment'])
+    return pd.crosstab(df_filtered['search_term'], df_filtered['sentiment'])
+
+def top_k_positions(scores, candidates, k=3):
+    # np.partition finds the k-th highest score in O(N); rows above it are kept and
+    # ties at the cut-off go to the earliest rows, so the result matches nlargest.
+    # NaN scores are set aside first (partition would sort them to the top) and,
+    # like nlargest, only fill the remaining slots at the end
+    is_nan = np.isnan(scores[candidates])
+    nan_candidates = candidates[is_nan]
+    candidates = candidates[~is_nan]
+    if len(candidates) > k:
+        cand_scores = scores[candidates]
+        kth = np.partition(cand_scores, len(cand_scores) - k)[len(cand_scores) - k]
+        above = candidates[cand_scores > kth]
+        tied = candidates[cand_scores == kth][:k - len(above)]
+        candidates = np.concatenate([above, tied])
+    top = candidates[np.argsort(-scores[candidates], kind='stable')]
+    return np.concatenate([top, nan_candidates[:k - len(top)]])
+
+@st.cache_data(max_entries=MAX_CACHED_SELECTIONS)
+def compute_top_posts(sources, products, start_date, end_date):
+    df_filtered = filter_data(sources, products, start_date, end_date)
+    pol = df_filtered['polarity'].to_numpy()
+    pos_idx = np.flatnonzero((df_filtered['sentiment'] == 'positive').to_numpy())
+    neg_idx = np.flatnonzero((df_filtered['sentiment'] == 'negative').to_numpy())
+    positive_posts = df_filtered.iloc[top_k_positions(pol, pos_idx)]
+    negative_posts = df_filtered.iloc[top_k_positions(-pol, neg_idx)]
+    return positive_posts, negative_posts
+
+@st.cache_data(max_entries=MAX_CACHED_SELECTIONS)
+def compute_word_frequencies(sources, products, start_date, end_date):
+    texts = filter_data(sources, products, start_date, end_date)['text']
+    # Tokenize, drop stop words and count in vectorized passes so WordCloud's own tokenizer is skipped
+    tokens = texts.str.lower().str.findall(r"[a-z]{3,}").explode().dropna()
+    tokens = tokens[~tokens.isin(STOP_WORDS)]
+    return tokens.value_counts().to_dict()
+
+# Only built once the user asks for a download; not cached, since each entry would be a full CSV copy
+def export_csv(sources, products, start_date, end_date):
+    return filter_data(sources, products, start_date, end_date).to_csv(index=False).encode()
+
+@st.cache_data(max_entries=MAX_CACHED_SELECTIONS)
+def render_wordcloud(sources, products, start_date, end_date):
+    # wordcloud pulls in matplotlib, so only import it once a cloud is actually rendered
+    from wordcloud import WordCloud
+    
+    word_freqs = compute_word_frequencies(sources, products, start_date, end_date)
+    wordcloud = WordCloud(
+        width=800, 
+        height=400, 
+        background_color='white'
+    ).generate_from_frequencies(word_freqs)
+    
+    buf = io.BytesIO()
+    wordcloud.to_image().save(buf, 'PNG')
+    return buf.getvalue()
 
 def main():
     st.set_page_config(page_title="DBS Bank Sentiment Dashboard", layout="wide", page_icon="🏦")
@@ -42,7 +232,7 @@ def main():
     st.markdown("*Analyzing third-party mentions across social media, news, and forums*")
     
     # Load data
-    df = load_data()
+    df, filter_options = load_data()
     
     # Sidebar filters
     st.sidebar.header("📊 Filters")
@@ -58,50 +248,43 @@ def main():
     # Source filter
     sources = st.sidebar.multiselect(
         "Select Sources",
-        options=df['source'].unique(),
-        default=df['source'].unique()
+        options=filter_options['source'],
+        default=filter_options['source']
     )
     
     # Product filter
     products = st.sidebar.multiselect(
         "Select Products/Keywords",
-        options=df['search_term'].unique(),
-        default=df['search_term'].unique()
+        options=filter_options['search_term'],
+        default=filter_options['search_term']
     )
     
     # Filter data
-    if len(date_range) == 2:
-        df_filtered = df[
-            (df['date'].dt.date >= date_range[0]) & 
-            (df['date'].dt.date <= date_range[1]) &
-            (df['source'].isin(sources)) &
-            (df['search_term'].isin(products))
-        ]
-    else:
-        df_filtered = df[
-            (df['source'].isin(sources)) &
-            (df['search_term'].isin(products))
-        ]
+    start_date, end_date = date_range if len(date_range) == 2 else (None, None)
+    filters = (tuple(sources), tuple(products), start_date, end_date)
+    total_mentions = count_rows(*filters)
+    # Checked once; cached aggregations are never called for an empty selection
+    empty = total_mentions == 0
     
     # Main metrics
+    sent_counts = pd.Series(dtype='int64') if empty else compute_sentiment_counts(*filters)
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        total_mentions = len(df_filtered)
         st.metric("📈 Total Mentions", total_mentions)
     
     with col2:
-        positive_count = len(df_filtered[df_filtered['sentiment'] == 'positive'])
+        positive_count = sent_counts.get('positive', 0)
         positive_pct = (positive_count / total_mentions * 100) if total_mentions > 0 else 0
         st.metric("👍 Positive", f"{positive_count} ({positive_pct:.1f}%)")
     
     with col3:
-        negative_count = len(df_filtered[df_filtered['sentiment'] == 'negative'])
+        negative_count = sent_counts.get('negative', 0)
         negative_pct = (negative_count / total_mentions * 100) if total_mentions > 0 else 0
         st.metric("👎 Negative", f"{negative_count} ({negative_pct:.1f}%)")
     
     with col4:
-        neutral_count = len(df_filtered[df_filtered['sentiment'] == 'neutral'])
+        neutral_count = sent_counts.get('neutral', 0)
         neutral_pct = (neutral_count / total_mentions * 100) if total_mentions > 0 else 0
         st.metric("😐 Neutral", f"{neutral_count} ({neutral_pct:.1f}%)")
     
@@ -110,17 +293,13 @@ def main():
     
     with col1:
         st.subheader("📊 Sentiment Distribution")
-        if not df_filtered.empty:
-            sentiment_counts = df_filtered['sentiment'].value_counts()
-            fig_pie = px.pie(
+        if not empty:
+            sentiment_counts = sent_counts[sent_counts > 0]
+            fig_pie = go.Figure(go.Pie(
+                labels=sentiment_counts.index,
                 values=sentiment_counts.values,
-                names=sentiment_counts.index,
-                color_discrete_map={
-                    'positive': '#2E8B57',
-                    'negative': '#DC143C',
-                    'neutral': '#4682B4'
-                }
-            )
+                marker=dict(colors=[SENTIMENT_COLORS.get(s) for s in sentiment_counts.index])
+            ))
             fig_pie.update_layout(height=400)
             st.plotly_chart(fig_pie, use_container_width=True)
         else:
@@ -128,13 +307,13 @@ def main():
     
     with col2:
         st.subheader("😊 Emotion Classification")
-        if not df_filtered.empty:
-            emotion_counts = df_filtered['emotion'].value_counts()
-            fig_emotion = px.pie(
+        if not empty:
+            emotion_counts = compute_emotion_counts(*filters)
+            fig_emotion = go.Figure(go.Pie(
+                labels=emotion_counts.index,
                 values=emotion_counts.values,
-                names=emotion_counts.index,
-                color_discrete_sequence=px.colors.qualitative.Set3
-            )
+                marker=dict(colors=EMOTION_COLORS)
+            ))
             fig_emotion.update_layout(height=400)
             st.plotly_chart(fig_emotion, use_container_width=True)
         else:
@@ -142,95 +321,80 @@ def main():
     
     # Time series
     st.subheader("📈 Sentiment Trend Over Time")
-    if not df_filtered.empty:
-        daily_sentiment = df_filtered.groupby([df_filtered['date'].dt.date, 'sentiment']).size().reset_index(name='count')
-        fig_time = px.line(
-            daily_sentiment,
-            x='date',
-            y='count',
-            color='sentiment',
-            color_discrete_map={
-                'positive': '#2E8B57',
-                'negative': '#DC143C',
-                'neutral': '#4682B4'
-            }
-        )
-        fig_time.update_layout(height=400)
+    if not empty:
+        trend_traces = compute_trend_traces(*filters)
+        fig_time = go.Figure([
+            go.Scattergl(
+                x=x,
+                y=y,
+                mode='lines',
+                name=sentiment,
+                line=dict(color=SENTIMENT_COLORS.get(sentiment))
+            )
+            for sentiment, (x, y) in trend_traces.items()
+        ])
+        fig_time.update_layout(height=400, xaxis_title='date', yaxis_title='count', legend_title_text='sentiment')
         st.plotly_chart(fig_time, use_container_width=True)
     else:
         st.info("No data available for selected filters")
     
     # Product breakdown
     st.subheader("🏦 Sentiment by Product/Keyword")
-    if not df_filtered.empty:
-        product_sentiment = df_filtered.groupby(['search_term', 'sentiment']).size().reset_index(name='count')
-        fig_product = px.bar(
-            product_sentiment,
-            x='search_term',
-            y='count',
-            color='sentiment',
-            color_discrete_map={
-                'positive': '#2E8B57',
-                'negative': '#DC143C',
-                'neutral': '#4682B4'
-            }
-        )
-        fig_product.update_layout(height=400, xaxis_tickangle=-45)
+    if not empty:
+        product_sentiment = compute_product_sentiment(*filters)
+        fig_product = go.Figure([
+            go.Bar(
+                x=product_sentiment.index,
+                y=product_sentiment[sentiment].to_numpy(),
+                name=sentiment,
+                marker=dict(color=SENTIMENT_COLORS.get(sentiment))
+            )
+            for sentiment in product_sentiment.columns
+        ])
+        fig_product.update_layout(height=400, xaxis_tickangle=-45, barmode='relative', xaxis_title='search_term', yaxis_title='count', legend_title_text='sentiment')
         st.plotly_chart(fig_product, use_container_width=True)
     else:
         st.info("No data available for selected filters")
     
     # Top posts section
     col1, col2 = st.columns(2)
-    
     with col1:
         st.subheader("👍 Top 3 Positive Mentions")
-        positive_posts = df_filtered[df_filtered['sentiment'] == 'positive'].nlargest(3, 'polarity')
-        for idx, row in positive_posts.iterrows():
-            with st.expander(f"💚 {row['platform']} - Score: {row['polarity']:.2f}"):
-                st.write(f"**Text:** {row['text']}")
-                st.write(f"**Source:** {row['source']} | **Platform:** {row['platform']}")
-                st.write(f"**Date:** {row['date'].strftime('%Y-%m-%d')}")
-    
     with col2:
         st.subheader("👎 Top 3 Negative Mentions")
-        negative_posts = df_filtered[df_filtered['sentiment'] == 'negative'].nsmallest(3, 'polarity')
-        for idx, row in negative_posts.iterrows():
-            with st.expander(f"🔴 {row['platform']} - Score: {row['polarity']:.2f}"):
-                st.write(f"**Text:** {row['text']}")
-                st.write(f"**Source:** {row['source']} | **Platform:** {row['platform']}")
-                st.write(f"**Date:** {row['date'].strftime('%Y-%m-%d')}")
     
-    # Word Cloud
-    st.subheader("☁️ Word Cloud - Key Terms")
-    if not df_filtered.empty:
-        all_text = ' '.join(df_filtered['text'].astype(str))
+    if not empty:
+        positive_posts, negative_posts = compute_top_posts(*filters)
         
-        # Remove common words
-        stop_words = {'dbs', 'bank', 'india', 'banking', 'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should'}
+        with col1:
+            for row in positive_posts.itertuples(index=False, name='Post'):
+                with st.expander(f"💚 {row.platform} - Score: {row.polarity:.2f}"):
+                    st.write(f"**Text:** {row.text}")
+                    st.write(f"**Source:** {row.source} | **Platform:** {row.platform}")
+                    st.write(f"**Date:** {row.date.strftime('%Y-%m-%d')}")
         
+        with col2:
+            for row in negative_posts.itertuples(index=False, name='Post'):
+                with st.expander(f"🔴 {row.platform} - Score: {row.polarity:.2f}"):
+                    st.write(f"**Text:** {row.text}")
+                    st.write(f"**Source:** {row.source} | **Platform:** {row.platform}")
+                    st.write(f"**Date:** {row.date.strftime('%Y-%m-%d')}")
+    
+    # Word Cloud
+    st.subheader("☁️ Word Cloud - Key Terms")
+    if not empty:
         try:
-            wordcloud = WordCloud(
-                width=800, 
-                height=400, 
-                background_color='white',
-                stopwords=stop_words
-            ).generate(all_text)
-            
-            fig, ax = plt.subplots(figsize=(10, 5))
-            ax.imshow(wordcloud, interpolation='bilinear')
-            ax.axis('off')
-            st.pyplot(fig)
+            png_bytes = render_wordcloud(*filters)
+            st.image(png_bytes, use_column_width=True)
         except:
             st.info("Unable to generate word cloud with current data")
     
     # Data export
     st.subheader("📥 Export Data")
     if st.button("Download Data as CSV"):
-        csv = df_filtered.to_csv(index=False)
         st.download_button(
             label="📄 Download CSV File",
-            data=csv,
+            data=export_csv(*filters),
             file_name=f"dbs_sentiment_data_{datetime.now().strftime('%Y%m%d')}.csv",
             mime="text/csv"
         )
@@ -0,0 +1,45 @@
+import os
+import pandas as pd
+
+# Resolved against this file so the app works from any working directory
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'dbs_sentiment.parquet')
+
+def build_data():
+    # In a real scenario, load from the scraper / sentiment pipeline output
+    # For now, we'll create sample data
+    sample_data = {
+        'text': [
+            'DBS Bank India has excellent customer service and quick loan approval',
+            'DBS app crashes too often, very frustrating experience',
+            'DBS net banking interface is user-friendly and secure',
+            'DBS credit card has high interest rates, not recommended',
+            'DBS mobile banking works smoothly, love the features',
+            'Poor customer support from DBS Bank India branch',
+            'DBS digibank is innovative and convenient for daily banking',
+            'DBS loan process is too lengthy and complicated',
+            'Great experience with DBS debit card internationally',
+            'DBS bank charges are reasonable compared to other banks'
+        ],
+        'sentiment': ['positive', 'negative', 'positive', 'negative', 'positive', 'negative', 'positive', 'negative', 'positive', 'neutral'],
+        'emotion': ['happy', 'angry', 'satisfied', 'disappointed', 'happy', 'angry', 'satisfied', 'disappointed', 'happy', 'neutral'],
+        'source': ['News', 'Reddit', 'News', 'Reddit', 'News', 'Reddit', 'News', 'Reddit', 'News', 'Reddit'],
+        'platform': ['Economic Times', 'r/india', 'Business Standard', 'r/bangalore', 'Financial Express', 'r/mumbai', 'Times of India', 'r/delhi', 'Hindu Business', 'r/india'],
+        'search_term': ['DBS Bank India', 'DBS app', 'DBS net banking', 'DBS credit card', 'DBS mobile banking', 'DBS Bank India', 'DBS digibank', 'DBS loan', 'DBS debit card', 'DBS Bank India'],
+        'polarity': [0.8, -0.7, 0.6, -0.5, 0.7, -0.6, 0.8, -0.4, 0.9, 0.1],
+        'date': pd.date_range(start='2024-06-01', periods=10, freq='D')
+    }
+    df = pd.DataFrame(sample_data)
+    
+    # Store low-cardinality columns dictionary-encoded so they load as categoricals
+    for col in ('sentiment', 'emotion', 'source', 'platform', 'search_term'):
+        df[col] = df[col].astype('category')
+    return df
+
+def main():
+    df = build_data()
+    os.makedirs(os.path.dirname(DATA_PATH), exist_ok=True)
+    df.to_parquet(DATA_PATH, engine='pyarrow', compression='zstd', index=False)
+    print(f"Wrote {len(df)} rows to {DATA_PATH}")
+
+if __name__ == "__main__":
+    main()